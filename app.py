@@ -1,11 +1,15 @@
+import codecs
+import importlib.util
 import io
-from typing import Optional, List
+from typing import Hashable, Optional, List, Tuple
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
 import streamlit as st
 
-from datetime import datetime, timedelta
-import sys
+from datetime import date, datetime
 
 # set up the webpage
 st.set_page_config(page_title="Import EGOV schedule to Google calendar", page_icon="📤", layout="wide")
@@ -16,85 +20,147 @@ with st.expander("Need help?"):
     1. Upload your CSV or Excel file.  
     2. If the file has extra header rows, adjust 'Skip rows'.  
     3. Preview the data in the main panel.  
-    4. Click 'Download CSV' to save the cleaned file.
+    4. Click 'Convert to Google Calendar', then 'Download my_google.csv' to save the calendar file.
     """)
     
-def _read_csv(file) -> pd.DataFrame:
+# Columns of the EGOV export used by the preview and the calendar conversion; other columns are skipped at read time
+egov_columns = ['STT', 'Mã lớp học phần', 'Nhóm', 'Lớp', 'Tên môn học', 'Sỉ số', 'Thứ',
+                'Từ tiết', 'Đến tiết', 'Tiết học', 'Tên phòng', 'Tuần học', 'Ngày bắt đầu']
+
+def _is_egov_column(column) -> bool:
+    return column in egov_columns
+
+# Declared dtypes spare the parsers an inference pass and keep all-digit week patterns such as "0123" as text.
+# Weekdays (2-8) and session numbers (1-17) fit in int8; columns only shown in the preview keep their inferred
+# types. Class codes are text, so a blank cell cannot turn 1001 into "1001.0" in the Subject. CSV start dates stay
+# text for _parse_start_dates, which also handles two-digit years that the pyarrow parser would misread; Excel date
+# cells are already typed.
+excel_dtypes = {'Tuần học': 'string[pyarrow]', 'Thứ': 'int8[pyarrow]', 'Từ tiết': 'int8[pyarrow]', 'Đến tiết': 'int8[pyarrow]',
+                'Mã lớp học phần': 'string[pyarrow]'}
+csv_dtypes = {**excel_dtypes, 'Ngày bắt đầu': 'string[pyarrow]'}
+
+# Readers are cached per upload so reruns skip re-parsing. They are keyed on the cheap (name, file_id)
+# upload key; the leading underscore keeps Streamlit from hashing the whole upload on every rerun.
+# Every upload gets a new file_id, so the caches are bounded and expire to keep old uploads from piling up.
+@st.cache_data(show_spinner=False, max_entries=16, ttl="1h")
+def _read_csv(upload_key: Tuple[str, str], _data: bytes, fast: bool = True) -> pd.DataFrame:
+    # Try the multi-threaded PyArrow parser first; on any failure use the pandas ladder below.
+    # It only accepts a column list, which raises when a column is missing and so also falls back.
+    if fast:
+        try:
+            return pd.read_csv(io.BytesIO(_data), engine="pyarrow", usecols=egov_columns, dtype=csv_dtypes,
+                               dtype_backend="pyarrow")
+        except Exception:
+            pass
     # Try UTF-8 first; fallback to latin-1; else let pandas sniff the separator.
     try:
-        return pd.read_csv(file)
+        return pd.read_csv(io.BytesIO(_data), engine="c", usecols=_is_egov_column, dtype=csv_dtypes,
+                           dtype_backend="pyarrow")
     except UnicodeDecodeError:
-        file.seek(0)
         try:
-            return pd.read_csv(file, encoding="latin-1")
+            return pd.read_csv(io.BytesIO(_data), engine="c", encoding="latin-1", usecols=_is_egov_column,
+                               dtype=csv_dtypes, dtype_backend="pyarrow")
         except Exception:
-            file.seek(0)
-            return pd.read_csv(file, sep=None, engine="python")
-
-def _read_excel(file, suffix: str, sheet_name: Optional[str] = None) -> pd.DataFrame:
-    # Use openpyxl for .xlsx and xlrd for .xls
-    if suffix == ".xlsx":
-        return pd.read_excel(file,skiprows=12, sheet_name=sheet_name, engine="openpyxl")
-    return pd.read_excel(file,skiprows=12, sheet_name=sheet_name, engine="xlrd")
-
-def _bytes_buffer(uploaded_file) -> io.BytesIO:
-    data = uploaded_file.read()
-    return io.BytesIO(data)
+            return pd.read_csv(io.BytesIO(_data), sep=None, engine="python", usecols=_is_egov_column,
+                               dtype=csv_dtypes, dtype_backend="pyarrow")
+
+def _excel_engine(suffix: str) -> str:
+    # Prefer the Rust-based calamine reader for both .xlsx and .xls; fall back to openpyxl / xlrd.
+    # Only look the package up here: pandas imports the chosen engine itself on the first Excel read,
+    # so CSV-only sessions never load any Excel engine.
+    if importlib.util.find_spec("python_calamine") is not None:
+        return "calamine"
+    return "openpyxl" if suffix == ".xlsx" else "xlrd"
+
+@st.cache_resource(show_spinner=False, max_entries=8, ttl="1h")
+def _open_workbook(upload_key: Tuple[str, str], _data: bytes, suffix: str) -> pd.ExcelFile:
+    # Open each upload once; listing sheets and reading any sheet reuse the same parsed workbook
+    return pd.ExcelFile(io.BytesIO(_data), engine=_excel_engine(suffix))
+
+@st.cache_data(show_spinner=False, max_entries=16, ttl="1h")
+def _read_excel(upload_key: Tuple[str, str], _data: bytes, suffix: str, sheet_name: Optional[str] = None,
+                skiprows: int = 12) -> pd.DataFrame:
+    workbook = _open_workbook(upload_key, _data, suffix)
+    # No dtype_backend here: on pandas 3 the Arrow backend rejects columns that mix number and text cells
+    # (a code like IT01A next to 1001, a footer in STT), so only the declared columns are Arrow-backed
+    return workbook.parse(sheet_name=sheet_name, skiprows=skiprows, usecols=_is_egov_column, dtype=excel_dtypes)
+
+def _list_sheets(upload_key: Tuple[str, str], data: bytes, suffix: str) -> List[str]:
+    return _open_workbook(upload_key, data, suffix).sheet_names
+
+def _parse_start_dates(values: pd.Series) -> pd.Series:
+    """Parses the 'Ngày bắt đầu' column in one vectorized pass; Excel cells already arrive as datetimes."""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    start_dates = pd.to_datetime(values, format='%m/%d/%Y', errors='coerce')
+    # Only the rows an earlier format missed are retried: two-digit years, then ISO text such as
+    # "2026-09-07 00:00:00", which is how date cells come out when a sheet is saved with them as text
+    for retry_format in ('%m/%d/%y', 'ISO8601'):
+        missing = start_dates.isna() & values.notna()
+        if not missing.any():
+            break
+        start_dates[missing] = pd.to_datetime(values[missing], format=retry_format, errors='coerce')
+    return start_dates
 
 # parse week pattern
-def parse_week_pattern(week_pattern):
-    """Parses the 'Week pattern' string and returns a list of active week numbers."""
-    active_weeks = []
-    for i, char in enumerate(week_pattern):
-        if char.isdigit():
-            active_weeks.append(i + 1) # Week number corresponds to index + 1
-    return active_weeks
+def _week_pattern_mask(week_patterns: pd.Series) -> np.ndarray:
+    """Returns a (rows x weeks) boolean matrix of the 'Week pattern' column; column i is True when week i + 1 is active."""
+    # Many classes share the same pattern, so only scan each distinct string once
+    codes, patterns = pd.factorize(week_patterns.fillna("").astype(str).to_numpy(dtype=object))
+    width = max(max(map(len, patterns), default=0), 1)
+    # Pad to a fixed width and view the distinct patterns as one byte matrix (non-ASCII characters become '?')
+    raw = "".join(pattern.ljust(width) for pattern in patterns).encode("ascii", errors="replace")
+    arr = np.frombuffer(raw, dtype=np.uint8).reshape(len(patterns), width)
+    # Unsigned wrap-around turns the '0'..'9' range check into a single subtract-and-compare per byte
+    return ((arr - np.uint8(ord("0"))) < 10)[codes]
 
 # extract date from the pattern
-def get_dates_for_pattern(start_date_str, day_of_week, active_weeks):
-    """Calculates the dates for each active week based on the start date and day of the week."""
-    dates = []
-    start_date = start_date_str
-    # remove this from streamlit
-    #parsed = False
-    #for fmt in ('%m/%d/%Y', '%m/%d/%y'):
-    #    try:
-    #        start_date = datetime.strptime(start_date_str, fmt)
-    #        parsed = True
-    #        break
-    #    except ValueError:
-    #        pass
-    #if not parsed and sys.platform.startswith('win'):
-    #    for fmt in ('%#m/%#d/%Y', '%#m/%#d/%y'):
-    #        try:
-    #            start_date = datetime.strptime(start_date_str, fmt)
-    #            parsed = True
-    #            break
-    #        except ValueError:
-    #            pass
-    #if not parsed:
-    #    raise ValueError(f"Could not parse date string: {start_date_str}")
-    # end of remove
-
-    # Adjust start date to the correct day of the week if needed
-    start_day_of_week = start_date.isoweekday() + 1 if start_date.isoweekday() != 7 else 8 # Monday is 2, Sunday is 8
-    days_difference = day_of_week - start_day_of_week
-    if days_difference < 0:
-      days_difference += 7
-    adjusted_start_date = start_date + timedelta(days=days_difference)
-
-    if not active_weeks:
-        return dates # Return empty list if no active weeks
-
-    firstweek = active_weeks[0]
-
-
-    for week_num in active_weeks:
-        # Calculate the date for the specific day of the week in the given week number
-        # Assuming the first week in the pattern corresponds to the week of the start date
-        date_of_week = adjusted_start_date + timedelta(weeks=week_num - firstweek)
-        dates.append(date_of_week)
-    return dates
+def get_dates_for_pattern(start_dates: pd.Series, days_of_week: pd.Series, active_weeks: np.ndarray):
+    """Calculates the dates for each active week based on the start date and day of the week.
+
+    Returns the source row index and the class date of every (row, active week) pair.
+    """
+    # Arrow-backed columns have no modulo kernel, so do the date maths on plain NumPy arrays.
+    # Class dates are whole days, so datetime64[D] keeps them unboxed end to end.
+    starts = start_dates.to_numpy(dtype="datetime64[D]")
+    days = days_of_week.to_numpy(dtype=np.int64, na_value=0)
+
+    # Adjust start date to the correct day of the week if needed; % 7 wraps negative differences, so no branch
+    start_day_of_week = start_dates.dt.dayofweek.to_numpy(dtype=np.int64, na_value=0) + 2 # Monday is 2, Sunday is 8
+    adjusted_start_date = starts + ((days - start_day_of_week) % 7).astype("timedelta64[D]")
+    # A row without a weekday has no date to land on; NaT drops its sessions like an unreadable start date
+    adjusted_start_date[days_of_week.isna().to_numpy()] = np.datetime64("NaT")
+
+    # Assuming the first week in the pattern corresponds to the week of the start date,
+    # shift each row back once to its week 1 so every session is a single add of its week index
+    firstweek = active_weeks.argmax(axis=1)
+    week_one_date = adjusted_start_date - firstweek.astype("timedelta64[W]")
+
+    # Calculate the date for the specific day of the week in the given week number
+    row_idx, week_idx = np.nonzero(active_weeks)
+    dates = week_one_date[row_idx] + week_idx.astype("timedelta64[W]")
+    return row_idx, dates
+
+def expand_class_dates(start_dates: pd.Series, days_of_week: pd.Series, week_patterns: pd.Series):
+    """Expands each row into its class sessions, computing every distinct (start date, day of week, week pattern) once.
+
+    Returns the source row index and the class date of every session, in row order.
+    """
+    keys = pd.DataFrame({'start': start_dates, 'day': days_of_week, 'pattern': week_patterns})
+    key_of_row = keys.groupby(list(keys.columns), sort=False, dropna=False).ngroup().to_numpy()
+    first_rows = np.unique(key_of_row, return_index=True)[1]
+
+    active_weeks = _week_pattern_mask(week_patterns.iloc[first_rows])
+    _, key_dates = get_dates_for_pattern(start_dates.iloc[first_rows], days_of_week.iloc[first_rows], active_weeks)
+
+    # Replay each key's sessions for every row that shares it, keeping the original row order
+    sessions_per_key = active_weeks.sum(axis=1)
+    key_offsets = np.cumsum(sessions_per_key) - sessions_per_key
+    sessions_per_row = sessions_per_key[key_of_row]
+    row_idx = np.repeat(np.arange(len(key_of_row)), sessions_per_row)
+    row_offsets = np.cumsum(sessions_per_row) - sessions_per_row
+    session_pos = np.arange(len(row_idx)) - row_offsets[row_idx]
+    return row_idx, key_dates[key_offsets[key_of_row][row_idx] + session_pos]
 
 # Lecture sessions (with 25-min breaks after session 3 and 9)
 lecture_array = [
@@ -139,6 +205,86 @@ practice_array = [
     ("21:00", "21:45")   # Session 17
 ]
 
+# Start and end times of each session as arrays, indexed by session number - 1
+lecture_starts = np.array([start for start, _ in lecture_array])
+lecture_ends = np.array([end for _, end in lecture_array])
+practice_starts = np.array([start for start, _ in practice_array])
+practice_ends = np.array([end for _, end in practice_array])
+
+def build_schedule(my_list: pd.DataFrame, today: date) -> pd.DataFrame:
+    """Converts the EGOV schedule into Google Calendar rows, keeping only sessions on or after today."""
+    # Apply the helper functions to the whole DataFrame at once
+    start_dates = _parse_start_dates(my_list['Ngày bắt đầu'])
+    unparsed = int((start_dates.isna() & my_list['Ngày bắt đầu'].notna()).sum())
+    # Rows with a start date but no weekday are classes too; footer rows have neither and are not counted
+    no_weekday = int((my_list['Thứ'].isna() & start_dates.notna()).sum())
+    if unparsed or no_weekday:
+        st.warning(f"{unparsed + no_weekday} row(s) have a start date or weekday that could not be read; "
+                   "their sessions are left out.")
+    row_idx, class_dates = expand_class_dates(start_dates, my_list['Thứ'], my_list['Tuần học'])
+
+    # Keep only sessions on or after today, compared on the raw datetime64 dates before anything is gathered
+    upcoming = class_dates >= np.datetime64(today, 'D')
+    row_idx, class_dates = row_idx[upcoming], class_dates[upcoming]
+
+    # Expand the schedule to one row per class session, keeping only the columns the calendar rows are built from
+    schedule_columns = ['Mã lớp học phần', 'Lớp', 'Tên môn học', 'Từ tiết', 'Đến tiết', 'Tên phòng']
+    # Gather only the needed columns straight from the source arrays instead of copying the whole frame first,
+    # and add the specific date of each class session as the 'Ngày' column of the same long-form frame
+    my_schedule = pd.DataFrame({
+        **{column: my_list[column].array.take(row_idx) for column in schedule_columns},
+        'Ngày': class_dates,
+    })
+
+    # Check practice or lecture session with a single regex pass
+    my_schedule['IsPractice'] = my_schedule['Tên môn học'].str.contains(r'Thực hành|Ứng dụng tin học', na=False, regex=True).astype(np.int8)
+    # Convert 'Từ tiết' to 'From_time' and 'Đến tiết' to 'End_time' based on 'IsPractice'
+
+    # Convert to Start time and End time by looking up whole columns in the session tables
+    from_idx = my_schedule['Từ tiết'].to_numpy(dtype=np.int8) - 1
+    to_idx = my_schedule['Đến tiết'].to_numpy(dtype=np.int8) - 1
+    is_practice = my_schedule['IsPractice'].to_numpy() == 1
+    start_time = np.where(is_practice, practice_starts[from_idx], lecture_starts[from_idx])
+    end_time = np.where(is_practice, practice_ends[to_idx], lecture_ends[to_idx])
+
+    # Create the 'Subject' column by combining 'Tên môn học', 'Mã lớp học phần' and 'Lớp' in a single str.cat pass
+    subject = my_schedule['Tên môn học'].str.cat([my_schedule['Mã lớp học phần'].astype(str), my_schedule['Lớp']], sep=' - ')
+    periods = 'Tiết:' + my_schedule['Từ tiết'].astype(str) + '-' + my_schedule['Đến tiết'].astype(str)
+
+    # Create the 'Start Date' column from the 'Ngày' column; the End Date is the same day
+    start_date = my_schedule['Ngày'].dt.strftime('%m/%d/%Y')
+
+    # Create the my_google dataframe in one go instead of inserting its columns one by one
+    my_google = pd.DataFrame({
+        'Subject': subject,
+        'Start Date': start_date,
+        'Start Time': start_time,
+        'End Date': start_date,
+        'End Time': end_time,
+        'Location': my_schedule['Tên phòng'],
+        'Description': my_schedule['Tên phòng'].str.cat([periods, subject], sep=';\r\n'),
+    })
+    return my_google
+
+def _to_csv_bytes(df: pd.DataFrame) -> bytes:
+    # Arrow writes straight from its column buffers; the UTF-8 BOM keeps Excel/Google reading it as utf_8_sig
+    sink = pa.BufferOutputStream()
+    pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), sink,
+                    write_options=pacsv.WriteOptions(include_header=True))
+    return codecs.BOM_UTF8 + sink.getvalue().to_pybytes()
+
+@st.cache_data(show_spinner="Building calendar...", max_entries=16, ttl="1h")
+def build_google_csv(source_key: Hashable, _my_list: pd.DataFrame, today: date) -> bytes:
+    """Runs the whole conversion and returns the Google Calendar CSV bytes.
+
+    Cached on source_key (the upload plus the sheet or parser that produced the frame) and today,
+    so reruns neither hash the DataFrame nor redo the conversion.
+    """
+    return _to_csv_bytes(build_schedule(_my_list, today))
+
+with st.sidebar:
+    fast_csv = st.toggle("Fast CSV parser (PyArrow)", value=True, help="Turn off if a CSV file fails to load or looks wrong.")
+
 uploaded = st.file_uploader(
     "Upload a .csv, .xlsx, or .xls file",
     type=["csv", "xlsx", "xls"],
@@ -147,20 +293,18 @@ uploaded = st.file_uploader(
 
 if "df" not in st.session_state:
     st.session_state.df = None
+    st.session_state.df_key = None
 
 if uploaded:
     name = uploaded.name
     suffix = name[name.rfind("."):].lower() if "." in name else ""
-    buf = _bytes_buffer(uploaded)
+    data = uploaded.getvalue()
+    upload_key = (name, uploaded.file_id)
 
     if suffix in {".xlsx", ".xls"}:
         # List sheets then read the chosen sheet
         try:
-            if suffix == ".xlsx":
-                xls = pd.ExcelFile(buf, engine="openpyxl")
-            else:
-                xls = pd.ExcelFile(buf, engine="xlrd")
-            sheets: List[str] = xls.sheet_names
+            sheets = _list_sheets(upload_key, data, suffix)
         except Exception as e:
             st.error(f"Failed to read Excel file: {e}")
             sheets = []
@@ -168,9 +312,9 @@ if uploaded:
         if sheets:
             sheet = st.selectbox("Select sheet to load", sheets, index=0)
             try:
-                buf.seek(0)
-                df = _read_excel(buf, suffix, sheet)
+                df = _read_excel(upload_key, data, suffix, sheet)
                 st.session_state.df = df
+                st.session_state.df_key = (upload_key, sheet)
             except Exception as e:
                 st.error(f"Error reading sheet '{sheet}': {e}")
         else:
@@ -178,8 +322,9 @@ if uploaded:
 
     elif suffix == ".csv":
         try:
-            df = _read_csv(buf)
+            df = _read_csv(upload_key, data, fast_csv)
             st.session_state.df = df
+            st.session_state.df_key = (upload_key, fast_csv)
         except Exception as e:
             st.error(f"Error reading CSV: {e}")
     else:
@@ -188,94 +333,27 @@ if uploaded:
 df = st.session_state.df
 
 if df is not None:
-    my_list = df
-    
     #Display data section
     st.subheader("👀 Your EGOV Schedule")    
     st.dataframe(df, use_container_width=True)
 
-    # Convert my schedule to google calendar schedule ---------------------------------------
-    
-    # Apply the helper functions to the DataFrame
-    my_list_2 = my_list.copy()
-    my_list_2['active_weeks'] = my_list_2['Tuần học'].apply(parse_week_pattern)
-    my_list_2['class_dates'] = my_list_2.apply(lambda row: get_dates_for_pattern(row['Ngày bắt đầu'], row['Thứ'], row['active_weeks']), axis=1)
-
-    # Create an empty list to store the expanded schedule data
-    schedule_data = []
-
-    # Iterate through each row in the original DataFrame (my_list_2)
-    for index, row in my_list_2.iterrows():
-        # For each date in the 'class_dates' list for this row
-        for class_date in row['class_dates']:
-            # Create a new row for the expanded schedule
-            new_row = {
-                'STT': row['STT'],
-                'Mã lớp học phần': row['Mã lớp học phần'],
-                'Nhóm': row['Nhóm'],
-                'Lớp': row['Lớp'],
-                'Tên môn học': row['Tên môn học'],
-                'Sỉ số': row['Sỉ số'],
-                'Thứ': row['Thứ'],
-                'Từ tiết': row['Từ tiết'],
-                'Đến tiết': row['Đến tiết'],
-                'Tiết học': row['Tiết học'],
-                'Tên phòng': row['Tên phòng'],
-                'Ngày': class_date # Add the specific date for this class session
-            }
-            # Append the new row to the schedule_data list
-            schedule_data.append(new_row)
-
-    # Create the new DataFrame from the list of dictionaries
-    my_schedule = pd.DataFrame(schedule_data)
-    
-    # Check practice or lecture session
-    my_schedule['IsPractice'] = 0
-    my_schedule.loc[my_schedule['Tên môn học'].str.contains('Thực hành', na=False), 'IsPractice'] = 1
-    my_schedule.loc[my_schedule['Tên môn học'].str.contains('Ứng dụng tin học', na=False), 'IsPractice'] = 1
-    # Convert 'Từ tiết' to 'From_time' and 'Đến tiết' to 'End_time' based on 'IsPractice'
-
-    # Convert to Start time and End time
-    my_schedule['Start time'] = my_schedule.apply(lambda row: practice_array[row['Từ tiết'] - 1][0] if row['IsPractice'] == 1 else lecture_array[row['Từ tiết'] - 1][0], axis=1)
-    my_schedule['End time'] = my_schedule.apply(lambda row: practice_array[row['Đến tiết'] - 1][1] if row['IsPractice'] == 1 else lecture_array[row['Đến tiết'] - 1][1], axis=1)
-
-    # Create the my_google dataframe
-    my_google = pd.DataFrame()
-
-    # Create the 'Subject' column by combining 'Tên môn học' and 'Mã lớp học phần'
-    my_google['Subject'] = my_schedule['Tên môn học'] + ' - ' + my_schedule['Mã lớp học phần'].astype(str) + ' - ' + my_schedule['Lớp']
-
-    # Create the 'Start Date' column from the 'Ngày' column
-    my_google['Start Date'] = my_schedule['Ngày'].dt.strftime('%m/%d/%Y')
-
-    my_google['Start Time'] = my_schedule['Start time']
-    my_google['End Date'] = my_google['Start Date']
-    my_google['End Time'] = my_schedule['End time']
-
-    # Create the 'Location' column from the 'Tên phòng' column
-    my_google['Location'] = my_schedule['Tên phòng']
-    my_google['Description'] = my_schedule['Tên phòng'] + ';\r\nTiết:' + my_schedule['Từ tiết'].astype(str) + '-' + my_schedule['Đến tiết'].astype(str) + ';\r\n' + my_google['Subject']
-
-    # Get today's date
-    today = datetime.now().date()
-
-    # Convert 'Start Date' column to datetime objects
-    my_google['Start Date'] = pd.to_datetime(my_google['Start Date'], format='%m/%d/%Y').dt.date
-
-    # Filter the DataFrame to keep only rows with 'Start Date' on or after today
-    my_google = my_google[my_google['Start Date'] >= today]
-
     # Download section
     st.subheader("📥 Download Google Calendar")
-    file_base = uploaded.name.rsplit(".", 1)[0] if uploaded else "data"
-    csv_bytes = my_google.to_csv(index=False).encode("utf_8_sig")
-    st.download_button(
-        label="Download my_google.csv",
-        data=csv_bytes,
-        #file_name=f"{file_base}.csv",
-        file_name=f"my_google.csv",
-        mime="text/csv",
-    )
+    # Convert my schedule to google calendar schedule only when asked; the download stays
+    # available for this upload across later reruns and is served from the cache
+    if st.button("Convert to Google Calendar"):
+        st.session_state.converted_key = st.session_state.df_key
+
+    if st.session_state.get("converted_key") == st.session_state.df_key:
+        file_base = uploaded.name.rsplit(".", 1)[0] if uploaded else "data"
+        csv_bytes = build_google_csv(st.session_state.df_key, df, datetime.now().date())
+        st.download_button(
+            label="Download my_google.csv",
+            data=csv_bytes,
+            #file_name=f"{file_base}.csv",
+            file_name=f"my_google.csv",
+            mime="text/csv",
+        )
 else:
     st.info("Upload a file to begin.")
     